@@ -0,0 +1,330 @@
+# Layout adapters for AMC portfolio workbooks
+# Each AMC publishes its monthly portfolio in its own Excel layout. An adapter
+# knows how to find the schemes in a workbook and turn a scheme sheet into
+# rows of the shared holdings schema below.
+
+from datetime import datetime, date
+import pandas as pd
+import hashlib
+import re
+import os
+import json
+
+
+# shared holdings schema - every adapter must produce exactly these columns
+HOLDINGS_COLUMNS = [
+    'amc_name',
+    'scheme_name',
+    'scheme_code',
+    'instrument_code',
+    'instrument_name',
+    'instrument_type',
+    'isin',
+    'portfolio_percentage',
+    'reporting_date',
+]
+
+# low-cardinality columns are kept as categoricals in memory
+CATEGORICAL_COLUMNS = ['amc_name', 'scheme_name', 'scheme_code', 'instrument_type', 'reporting_date']
+
+LAYOUT_CACHE_FILE = os.path.join("output", ".layout_cache.json")
+
+# name -> adapter class, filled by register_adapter
+ADAPTERS = {}
+
+
+def register_adapter(adapter_cls):
+    # class decorator that makes an adapter available for detection
+    ADAPTERS[adapter_cls.name] = adapter_cls
+    return adapter_cls
+
+
+def to_holdings_frame(holdings):
+    # build a dataframe with the shared schema, even when there are no rows
+    return pd.DataFrame(holdings, columns=HOLDINGS_COLUMNS)
+
+
+def apply_holdings_dtypes(df):
+    # consistent dtypes for holdings frames, whether freshly parsed or read from csv
+    df = df.copy()
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    if 'portfolio_percentage' in df.columns:
+        df['portfolio_percentage'] = pd.to_numeric(df['portfolio_percentage'], errors='coerce')
+    return df
+
+
+# "December 31, 2025", "31 December 2025", "31-Dec-2025", "31/12/2025"
+STATEMENT_DATE_PATTERNS = [
+    (re.compile(r'([A-Za-z]+)\s+(\d{1,2}),?\s+(\d{4})'), lambda m: f"{m[1][:3]} {m[2]} {m[3]}", "%b %d %Y"),
+    (re.compile(r'(\d{1,2})[\s-]+([A-Za-z]+)[\s,-]+(\d{4})'), lambda m: f"{m[2][:3]} {m[1]} {m[3]}", "%b %d %Y"),
+    (re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})'), lambda m: f"{m[1]}/{m[2]}/{m[3]}", "%d/%m/%Y"),
+]
+
+
+def parse_statement_date(cell_value):
+    # ISO date from an "as on <date>" statement header, None if there isn't one
+    if cell_value is None:
+        return None
+    if isinstance(cell_value, (datetime, date)):
+        return cell_value.strftime("%Y-%m-%d")
+
+    text = str(cell_value)
+    match = re.search(r'as on\s+(.+)', text, re.IGNORECASE)
+    if not match:
+        return None
+    text = match.group(1)
+
+    for pattern, to_text, fmt in STATEMENT_DATE_PATTERNS:
+        found = pattern.search(text)
+        if found:
+            try:
+                return datetime.strptime(to_text(found), fmt).strftime("%Y-%m-%d")
+            except ValueError:
+                continue
+    return None
+
+
+class LayoutAdapter:
+    # Base class for AMC layouts. Subclasses set `name` and `amc_name` and
+    # implement matches(), get_scheme_list() and parse_scheme_sheet().
+
+    name = None
+    amc_name = None
+
+    def __init__(self, excel_file_path, amc_name=None, excel_file=None):
+        self.excel_file_path = excel_file_path
+        self.amc_name = amc_name or self.amc_name
+        self.excel_file = excel_file if excel_file is not None else pd.ExcelFile(excel_file_path)
+        self.reporting_date = None
+
+    @classmethod
+    def matches(cls, excel_file):
+        # return True if the opened workbook looks like this layout
+        raise NotImplementedError
+
+    def get_scheme_list(self):
+        # return {sheet_name: scheme_full_name}
+        raise NotImplementedError
+
+    def parse_scheme_sheet(self, sheet_name, scheme_full_name):
+        # return (equity_df, debt_df) in the shared schema
+        raise NotImplementedError
+
+    def close(self):
+        self.excel_file.close()
+
+
+@register_adapter
+class AxisLayoutAdapter(LayoutAdapter):
+    # Axis MF: an "Index" sheet lists short name -> scheme name, each scheme
+    # has its own sheet with a "Name of the Instrument ... ISIN" header row
+    # followed by "Equity & related" / "Debt Instruments" sections.
+
+    name = "axis"
+    amc_name = "Axis Mutual Fund"
+
+    INDEX_SHEET = "Index"
+    HEADER_MARKERS = ('Name of the Instrument', 'ISIN')
+    EQUITY_MARKERS = ('Equity', 'related')
+    DEBT_MARKER = 'Debt Instruments'
+    SKIP_MARKERS = (
+        'Sub Total', 'GRAND TOTAL', 'Grand Total',
+        'Listed', 'Unlisted', 'Privately placed',
+        'Reverse Repo', 'TREPS', 'Net Receivables',
+    )
+    PERCENTAGE_COLUMNS = [6, 5, 7]  # try different columns
+
+    @classmethod
+    def matches(cls, excel_file):
+        sheet_names = excel_file.sheet_names
+        if cls.INDEX_SHEET not in sheet_names:
+            return False
+
+        # only peek at the top of the first scheme sheet
+        scheme_sheets = [s for s in sheet_names if s != cls.INDEX_SHEET]
+        if not scheme_sheets:
+            return False
+        probe = excel_file.parse(scheme_sheets[0], header=None, nrows=20)
+        return cls.find_header_row(probe) is not None
+
+    @classmethod
+    def find_header_row(cls, df):
+        for i in range(min(20, len(df))):
+            row_text = ' '.join([str(x) for x in df.iloc[i].values])
+            if all(marker in row_text for marker in cls.HEADER_MARKERS):
+                return i
+        return None
+
+    def extract_reporting_date(self, df):
+        # try to find the date from sheet, e.g. "Monthly Portfolio Statement as on December 31, 2025"
+        for i in range(min(10, len(df))):
+            for col in df.columns:
+                reporting_date = parse_statement_date(df.iloc[i, col])
+                if reporting_date:
+                    return reporting_date
+        return None
+
+    def get_scheme_list(self):
+        # get all schemes from index sheet
+        index_df = self.excel_file.parse(self.INDEX_SHEET, header=0)
+
+        schemes = {}
+        for _, row in index_df.iterrows():
+            if pd.notna(row.iloc[1]) and pd.notna(row.iloc[2]):
+                short_name = str(row.iloc[1]).strip()
+                full_name = str(row.iloc[2]).strip()
+                if short_name and full_name and short_name != 'Short Name':
+                    schemes[short_name] = full_name
+
+        return schemes
+
+    def parse_scheme_sheet(self, sheet_name, scheme_full_name):
+        # Parse individual scheme sheet for equity and debt data
+        # reuse the already opened workbook instead of re-opening it per sheet
+        df = self.excel_file.parse(sheet_name, header=None)
+
+        # keep looking on later sheets until one carries the statement date
+        if not self.reporting_date:
+            self.reporting_date = self.extract_reporting_date(df)
+
+        equity_holdings = []
+        debt_holdings = []
+
+        header_row_idx = self.find_header_row(df)
+        if header_row_idx is None:
+            return to_holdings_frame([]), to_holdings_frame([])
+
+        current_type = None
+
+        for idx in range(header_row_idx + 1, len(df)):
+            row = df.iloc[idx]
+            row_str = ' '.join([str(x) for x in row.values if pd.notna(x)])
+
+            # check section type
+            if all(marker in row_str for marker in self.EQUITY_MARKERS):
+                current_type = 'Equity'
+                continue
+            elif self.DEBT_MARKER in row_str:
+                current_type = 'Debt'
+                continue
+            elif any(marker in row_str for marker in self.SKIP_MARKERS):
+                continue
+
+            if current_type:
+                # extract instrument details
+                instrument_code = str(row.iloc[0]) if pd.notna(row.iloc[0]) else None
+                instrument_name = str(row.iloc[1]) if len(row) > 1 and pd.notna(row.iloc[1]) else None
+                isin = str(row.iloc[2]) if len(row) > 2 and pd.notna(row.iloc[2]) else None
+                if not instrument_name or instrument_name == 'nan' or instrument_name == 'NaN':
+                    continue
+                if instrument_name in ['Sub Total', 'Total', 'GRAND TOTAL']:
+                    continue
+
+                percentage = None
+                for col_idx in self.PERCENTAGE_COLUMNS:
+                    if len(row) > col_idx:
+                        val = row.iloc[col_idx]
+                        if pd.notna(val):
+                            try:
+                                percentage = float(val)
+                                break
+                            except (TypeError, ValueError):
+                                pass
+
+                if percentage is not None:
+                    holding = {
+                        'amc_name': self.amc_name,
+                        'scheme_name': scheme_full_name,
+                        'scheme_code': sheet_name,
+                        'instrument_code': instrument_code if instrument_code != 'nan' else None,
+                        'instrument_name': instrument_name,
+                        'instrument_type': current_type,
+                        'isin': isin if isin and isin != 'nan' and len(isin) == 12 else None,
+                        'portfolio_percentage': percentage,
+                        'reporting_date': self.reporting_date
+                    }
+
+                    if current_type == 'Equity':
+                        equity_holdings.append(holding)
+                    elif current_type == 'Debt':
+                        debt_holdings.append(holding)
+
+        return to_holdings_frame(equity_holdings), to_holdings_frame(debt_holdings)
+
+
+def layout_signature(excel_file):
+    # structural identity for a workbook: its sheet names
+    # a new month of the same AMC keeps its sheets, so it reuses the cached layout
+    names = '\n'.join(sorted(str(name) for name in excel_file.sheet_names))
+    return hashlib.sha1(names.encode('utf-8')).hexdigest()
+
+
+def _load_layout_cache(cache_file):
+    if not cache_file or not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_layout_cache(cache, cache_file):
+    if not cache_file:
+        return
+    os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+    with open(cache_file, 'w') as f:
+        json.dump(cache, f, indent=2)
+
+
+def detect_adapter_name(excel_file_path, cache_file=LAYOUT_CACHE_FILE, excel_file=None):
+    # figure out which registered adapter handles a workbook
+    # results are cached by sheet-name signature, so workbooks with a known
+    # structure skip the layout probes
+    owns_file = excel_file is None
+    if owns_file:
+        excel_file = pd.ExcelFile(excel_file_path)
+
+    try:
+        cache = _load_layout_cache(cache_file)
+        signature = layout_signature(excel_file)
+
+        cached = cache.get(signature)
+        if cached in ADAPTERS:
+            return cached
+
+        for name, adapter_cls in ADAPTERS.items():
+            try:
+                if adapter_cls.matches(excel_file):
+                    cache[signature] = name
+                    _save_layout_cache(cache, cache_file)
+                    return name
+            except Exception as e:
+                print(f"⚠ Layout check '{name}' failed for {excel_file_path}: {str(e)}")
+
+        return None
+    finally:
+        if owns_file:
+            excel_file.close()
+
+
+def get_adapter(excel_file_path, adapter_name=None, amc_name=None, cache_file=LAYOUT_CACHE_FILE):
+    # build the adapter instance for a workbook, detecting the layout if needed
+    # the adapter owns the opened workbook, call adapter.close() when done
+    excel_file = pd.ExcelFile(excel_file_path)
+
+    try:
+        if adapter_name is None:
+            adapter_name = detect_adapter_name(excel_file_path, cache_file=cache_file, excel_file=excel_file)
+            if adapter_name is None:
+                raise ValueError(f"No layout adapter matches '{excel_file_path}'")
+
+        if adapter_name not in ADAPTERS:
+            raise ValueError(f"Unknown layout adapter '{adapter_name}'")
+    except Exception:
+        excel_file.close()
+        raise
+
+    return ADAPTERS[adapter_name](excel_file_path, amc_name=amc_name, excel_file=excel_file)
@@ -1,45 +1,164 @@
-import pandas as pd
+# Workbook profiler
+# Streams only the first N rows of every sheet in one read-only pass and
+# prints a layout fingerprint per sheet (header row, column roles, section
+# markers, row count estimate). Sheets whose layout differs from the majority
+# are flagged, so format changes show up before running the consolidation.
+# The Index sheet is profiled too, but it is a scheme list rather than a
+# holdings sheet, so it is reported separately and not part of the majority.
+#
+# Usage:
+#   python analyze_excel.py [excel_file] [--rows N]
+
+from collections import Counter
+from openpyxl.utils import get_column_letter
 import openpyxl
+import time
+import sys
+import os
+
+from amc_adapters import AxisLayoutAdapter
+
+
+DEFAULT_PROFILE_ROWS = 40
+
+# header text -> column role (first keyword match wins)
+COLUMN_ROLES = [
+    ('name of the instrument', 'name'),
+    ('isin', 'isin'),
+    ('industry', 'industry/rating'),
+    ('rating', 'industry/rating'),
+    ('quantity', 'quantity'),
+    ('market', 'market_value'),
+    ('net assets', 'percentage'),
+    ('nav', 'percentage'),
+    ('ytm', 'ytm'),
+    ('ytc', 'ytc'),
+    ('yield', 'ytm'),
+]
+
+SECTION_MARKERS = {
+    'equity': lambda text: all(m in text for m in AxisLayoutAdapter.EQUITY_MARKERS),
+    'debt': lambda text: AxisLayoutAdapter.DEBT_MARKER in text,
+    'money_market': lambda text: 'Money Market' in text,
+    'mutual_fund_units': lambda text: 'Mutual Fund Units' in text,
+    'treps': lambda text: 'TREPS' in text or 'Reverse Repo' in text,
+    'grand_total': lambda text: 'GRAND TOTAL' in text or 'Grand Total' in text,
+}
+
+
+def find_header_row(rows):
+    for i, row in enumerate(rows[:20]):
+        row_text = ' '.join(str(x) for x in row if x is not None)
+        if all(marker in row_text for marker in AxisLayoutAdapter.HEADER_MARKERS):
+            return i
+    return None
+
+
+def column_roles(header):
+    roles = {}
+    for idx, cell in enumerate(header):
+        if cell is None:
+            continue
+        # header cells wrap, e.g. "% to Net\n Assets"
+        text = ' '.join(str(cell).lower().split())
+        for keyword, role in COLUMN_ROLES:
+            if keyword in text:
+                roles[get_column_letter(idx + 1)] = role
+                break
+    return roles
+
+
+def profile_sheet(ws, max_rows):
+    rows = [tuple(row) for row in ws.iter_rows(max_row=max_rows, values_only=True)]
+
+    header_row = find_header_row(rows)
+    roles = column_roles(rows[header_row]) if header_row is not None else {}
+
+    markers = []
+    for row in rows:
+        row_text = ' '.join(str(x) for x in row if x is not None)
+        for marker, check in SECTION_MARKERS.items():
+            if marker not in markers and check(row_text):
+                markers.append(marker)
+
+    return {
+        'sheet': ws.title,
+        # from the sheet's stored dimension, not a full scan
+        'row_estimate': ws.max_row,
+        'header_row': header_row + 1 if header_row is not None else None,
+        'roles': roles,
+        'markers': markers,
+        'is_index': ws.title == AxisLayoutAdapter.INDEX_SHEET,
+    }
+
 
-# Load the Excel file
-file_path = "Monthly Portfolio-31 12 25.xlsx"
-excel_file = pd.ExcelFile(file_path)
-
-# Get all sheet names
-print("=" * 80)
-print("SHEET NAMES IN THE EXCEL FILE:")
-print("=" * 80)
-for i, sheet in enumerate(excel_file.sheet_names, 1):
-    print(f"{i}. {sheet}")
-
-print(f"\nTotal Sheets: {len(excel_file.sheet_names)}")
-
-# Analyze Index sheet
-print("\n" + "=" * 80)
-print("ANALYZING INDEX SHEET:")
-print("=" * 80)
-try:
-    index_df = pd.read_excel(file_path, sheet_name="Index", header=None)
-    print(f"Rows: {len(index_df)}, Columns: {len(index_df.columns)}")
-    print("\nFirst 15 rows:")
-    print(index_df.head(15))
-except Exception as e:
-    print(f"Error reading Index sheet: {e}")
-
-# Analyze first few scheme sheets
-print("\n" + "=" * 80)
-print("ANALYZING SAMPLE SCHEME SHEETS:")
-print("=" * 80)
-
-# Get non-index sheets
-scheme_sheets = [s for s in excel_file.sheet_names if s.lower() != "index"][:3]
-
-for sheet in scheme_sheets:
-    print(f"\n--- Sheet: {sheet} ---")
+def layout_fingerprint(profile):
+    # what has to match for two sheets to be parsed the same way
+    return (profile['header_row'], tuple(sorted(profile['roles'].items())))
+
+
+def profile_workbook(file_path, max_rows=DEFAULT_PROFILE_ROWS):
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
     try:
-        df = pd.read_excel(file_path, sheet_name=sheet, header=None)
-        print(f"Rows: {len(df)}, Columns: {len(df.columns)}")
-        print("\nFirst 20 rows:")
-        print(df.head(20))
-    except Exception as e:
-        print(f"Error reading sheet: {e}")
+        profiles = [profile_sheet(ws, max_rows) for ws in wb.worksheets]
+    finally:
+        wb.close()
+
+    scheme_profiles = [p for p in profiles if not p['is_index']]
+    fingerprints = Counter(layout_fingerprint(p) for p in scheme_profiles)
+    majority = fingerprints.most_common(1)[0][0] if fingerprints else None
+    for p in profiles:
+        p['differs'] = not p['is_index'] and layout_fingerprint(p) != majority
+
+    return profiles, majority
+
+
+def print_report(file_path, profiles, majority, elapsed, max_rows):
+    print("=" * 80)
+    print(f"WORKBOOK PROFILE: {os.path.basename(file_path)}")
+    print("=" * 80)
+    scheme_count = sum(1 for p in profiles if not p['is_index'])
+    print(f"Sheets: {len(profiles)}, scheme sheets: {scheme_count} (first {max_rows} rows each, {elapsed:.2f}s)")
+
+    if majority is not None:
+        header_row, roles = majority
+        print(f"\nMajority layout:")
+        print(f"  Header row: {header_row}")
+        print(f"  Columns: {', '.join(f'{col}={role}' for col, role in roles) or '-'}")
+
+    print(f"\n{'Sheet':<12} {'Rows~':>6} {'Header':>7}  {'Sections':<35} Layout")
+    for p in profiles:
+        flag = "index" if p['is_index'] else ("⚠ DIFFERS" if p['differs'] else "ok")
+        header = p['header_row'] if p['header_row'] is not None else '-'
+        print(f"{p['sheet'][:12]:<12} {str(p['row_estimate'] or '?'):>6} {str(header):>7}  "
+              f"{', '.join(p['markers'])[:35]:<35} {flag}")
+
+    different = [p for p in profiles if p['differs']]
+    print(f"\n{len(different)} sheet(s) differ from the majority layout")
+    for p in different:
+        roles = ', '.join(f'{col}={role}' for col, role in sorted(p['roles'].items())) or 'no header found'
+        print(f"  - {p['sheet']}: header row {p['header_row']}, {roles}")
+
+
+def main():
+    args = sys.argv[1:]
+    max_rows = DEFAULT_PROFILE_ROWS
+    if '--rows' in args:
+        i = args.index('--rows')
+        max_rows = int(args[i + 1])
+        del args[i:i + 2]
+
+    file_path = args[0] if args else "Monthly Portfolio-31 12 25.xlsx"
+    if not os.path.exists(file_path):
+        print(f"Error: File '{file_path}' not found!")
+        return
+
+    start = time.perf_counter()
+    profiles, majority = profile_workbook(file_path, max_rows)
+    elapsed = time.perf_counter() - start
+
+    print_report(file_path, profiles, majority, elapsed, max_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# Multi-AMC consolidation driver
+# Runs many AMC workbooks in parallel (one process per workbook) and writes
+# a single consolidated output plus a per-AMC run report.
+#
+# Usage:
+#   python consolidate_amcs.py                 # every .xlsx in downloads/
+#   python consolidate_amcs.py a.xlsx b.xlsx   # explicit workbooks
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import pandas as pd
+import time
+import sys
+import os
+
+from amc_adapters import detect_adapter_name, to_holdings_frame, apply_holdings_dtypes
+from entity_resolution import InstrumentResolver
+from consolidate_portfolio import PortfolioConsolidator, save_holdings, file_hash
+
+
+def find_workbooks(input_dir="downloads"):
+    # list excel workbooks in a directory, skipping office lock files
+    if not os.path.isdir(input_dir):
+        return []
+    return sorted(
+        os.path.join(input_dir, f) for f in os.listdir(input_dir)
+        if f.endswith('.xlsx') and not f.startswith('~$')
+    )
+
+
+def consolidate_workbook(excel_file_path, adapter_name):
+    # worker: consolidate one workbook and time it
+    start = time.perf_counter()
+    consolidator = PortfolioConsolidator(excel_file_path, adapter=adapter_name)
+    try:
+        equity_df, debt_df = consolidator.consolidate_all_schemes(verbose=False)
+    finally:
+        consolidator.close()
+    # fails the workbook, so it shows up under FAILED in the run report
+    consolidator.require_reporting_date()
+    elapsed = time.perf_counter() - start
+
+    return {
+        'file': excel_file_path,
+        'adapter': adapter_name,
+        'amc_name': consolidator.amc_name,
+        'reporting_date': consolidator.reporting_date,
+        'schemes': len(consolidator.get_scheme_list()),
+        'holdings': len(equity_df) + len(debt_df),
+        'seconds': elapsed,
+        'equity_df': equity_df,
+        'debt_df': debt_df,
+    }
+
+
+class MultiAMCConsolidator:
+
+    def __init__(self, workbooks, output_dir="output", max_workers=None):
+        self.workbooks = workbooks
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self.results = []
+        self.errors = {}
+        # path -> reason, for re-downloads of a workbook that is already included
+        self.skipped = {}
+        self.wall_seconds = 0.0
+        self.layout_cache_file = os.path.join(output_dir, ".layout_cache.json")
+
+    def detect_layouts(self):
+        # choose an adapter per workbook in the parent process
+        # (detection is cached by sheet-name signature, so known layouts aren't re-probed)
+        # identical files (e.g. "x (1).xlsx") are only processed once
+        jobs = {}
+        seen_hashes = {}
+        for path in self.workbooks:
+            try:
+                digest = file_hash(path)
+                if digest in seen_hashes:
+                    self.skipped[path] = f"same content as {seen_hashes[digest]}"
+                    print(f"↷ Skipping {path}: same content as {seen_hashes[digest]}")
+                    continue
+                seen_hashes[digest] = path
+                adapter_name = detect_adapter_name(path, cache_file=self.layout_cache_file)
+            except Exception as e:
+                self.errors[path] = f"could not open workbook: {str(e)}"
+                print(f"✗ Could not open {path}: {str(e)}")
+                continue
+            if adapter_name is None:
+                self.errors[path] = "no matching layout adapter"
+                print(f"⚠ Skipping {path}: no matching layout adapter")
+                continue
+            jobs[path] = adapter_name
+        return jobs
+
+    def run(self):
+        jobs = self.detect_layouts()
+        print(f"Processing {len(jobs)} workbook(s) with {self.max_workers or os.cpu_count()} workers...\n")
+
+        run_start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(consolidate_workbook, path, adapter_name): path
+                for path, adapter_name in jobs.items()
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self.errors[path] = str(e)
+                    print(f"✗ Error processing {path}: {str(e)}")
+                    continue
+                self.results.append(result)
+                print(f"✓ {result['amc_name']}: {result['holdings']} holdings "
+                      f"from {result['schemes']} schemes in {result['seconds']:.1f}s")
+        self.wall_seconds = time.perf_counter() - run_start
+        self.drop_duplicate_statements()
+
+        equity_frames = [r['equity_df'] for r in self.results if not r['equity_df'].empty]
+        debt_frames = [r['debt_df'] for r in self.results if not r['debt_df'].empty]
+        equity_df = pd.concat(equity_frames, ignore_index=True) if equity_frames else to_holdings_frame([])
+        debt_df = pd.concat(debt_frames, ignore_index=True) if debt_frames else to_holdings_frame([])
+
+        # resolve ids once in the parent so every AMC shares the same id space
+        resolver = InstrumentResolver(os.path.join(self.output_dir, "instrument_ids.json"))
+        equity_df = apply_holdings_dtypes(resolver.resolve(equity_df))
+        debt_df = apply_holdings_dtypes(resolver.resolve(debt_df))
+
+        return equity_df, debt_df
+
+    def drop_duplicate_statements(self):
+        # one statement per (amc_name, reporting_date): a re-saved copy of the
+        # same month would otherwise count every holding twice
+        kept = {}
+        for result in sorted(self.results, key=lambda r: r['file']):
+            key = (result['amc_name'], result['reporting_date'])
+            if key in kept:
+                reason = f"{key[0]} {key[1]} already loaded from {kept[key]['file']}"
+                self.skipped[result['file']] = reason
+                print(f"↷ Skipping {result['file']}: {reason}")
+                continue
+            kept[key] = result
+        self.results = list(kept.values())
+
+    def save(self, equity_df, debt_df):
+        save_holdings(equity_df, debt_df, self.output_dir)
+        self.write_run_report()
+
+    def write_run_report(self):
+        report = []
+
+        report.append("=" * 80)
+        report.append("MULTI-AMC CONSOLIDATION RUN REPORT")
+        report.append("=" * 80)
+        report.append(f"Run At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        report.append(f"Workbooks: {len(self.workbooks)} "
+                      f"(ok: {len(self.results)}, failed: {len(self.errors)}, "
+                      f"skipped: {len(self.skipped)})")
+        report.append(f"Wall Time: {self.wall_seconds:.1f}s")
+        report.append("")
+
+        report.append(f"{'AMC':<35} {'Schemes':>8} {'Holdings':>9} {'Secs':>7} {'Rows/s':>9} {'Sheets/s':>9}")
+        for r in sorted(self.results, key=lambda r: r['amc_name']):
+            secs = r['seconds'] or 1e-9
+            report.append(f"{r['amc_name'][:35]:<35} {r['schemes']:>8} {r['holdings']:>9} "
+                          f"{r['seconds']:>7.1f} {r['holdings'] / secs:>9.0f} {r['schemes'] / secs:>9.1f}")
+
+        if self.errors:
+            report.append("\nFAILED WORKBOOKS:")
+            for path, error in self.errors.items():
+                report.append(f"  {path}: {error}")
+
+        if self.skipped:
+            report.append("\nSKIPPED DUPLICATES:")
+            for path, reason in self.skipped.items():
+                report.append(f"  {path}: {reason}")
+
+        report.append("=" * 80)
+
+        report_text = "\n".join(report)
+        print("\n" + report_text)
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        report_file = os.path.join(self.output_dir, "run_report.txt")
+        with open(report_file, 'w') as f:
+            f.write(report_text)
+
+
+def main():
+    print("=" * 80)
+    print("MULTI-AMC PORTFOLIO CONSOLIDATION")
+    print("=" * 80)
+    print()
+
+    workbooks = sys.argv[1:] or find_workbooks("downloads")
+    if not workbooks:
+        print("Error: no workbooks found (pass paths or put .xlsx files in 'downloads')")
+        return
+
+    driver = MultiAMCConsolidator(workbooks, output_dir="output")
+    equity_df, debt_df = driver.run()
+
+    print("\nSaving results to CSV files...")
+    driver.save(equity_df, debt_df)
+
+
+if __name__ == "__main__":
+    main()
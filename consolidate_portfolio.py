@@ -2,134 +2,59 @@
 # Takes Excel file and converts to CSV format
 
 import pandas as pd
-import re
 from datetime import datetime
+import hashlib
 import os
 
+from amc_adapters import get_adapter, apply_holdings_dtypes, LAYOUT_CACHE_FILE
+from entity_resolution import InstrumentResolver
+
 
 class PortfolioConsolidator:
     # Main class for processing portfolio data
+    # layout specific parsing lives in the adapters (see amc_adapters.py)
     
-    def __init__(self, excel_file_path, amc_name="Axis Mutual Fund"):
+    def __init__(self, excel_file_path, amc_name=None, adapter=None, resolver=None,
+                 layout_cache_file=LAYOUT_CACHE_FILE):
         self.excel_file_path = excel_file_path
-        self.amc_name = amc_name
-        self.excel_file = pd.ExcelFile(excel_file_path)
+        if adapter is None or isinstance(adapter, str):
+            adapter = get_adapter(excel_file_path, adapter_name=adapter, amc_name=amc_name,
+                                  cache_file=layout_cache_file)
+        self.adapter = adapter
+        self.amc_name = adapter.amc_name
+        self.excel_file = adapter.excel_file
+        self.resolver = resolver
         self.reporting_date = None
-        
-    def extract_reporting_date(self, df):
-        # try to find the date from sheet
-        for i in range(min(10, len(df))):
-            for col in df.columns:
-                cell_value = str(df.iloc[i, col])
-                if 'December 31' in cell_value or 'december 31' in cell_value.lower():
-                    match = re.search(r'202[0-9]', cell_value)
-                    if match:
-                        return "2025-12-31"
-        return "2025-12-31"  # default dec 2025
+        self._schemes = None
     
     def parse_scheme_sheet(self, sheet_name, scheme_full_name):
         # Parse individual scheme sheet for equity and debt data
-        df = pd.read_excel(self.excel_file_path, sheet_name=sheet_name, header=None)
-        
+        equity_df, debt_df = self.adapter.parse_scheme_sheet(sheet_name, scheme_full_name)
+        self.reporting_date = self.adapter.reporting_date
+        return equity_df, debt_df
+    
+    def close(self):
+        # release the workbook file handle
+        self.adapter.close()
+    
+    def require_reporting_date(self):
+        # outputs are keyed by (amc_name, reporting_date), rows without a date
+        # would be merged and summarised as "None", so refuse them
         if not self.reporting_date:
-            self.reporting_date = self.extract_reporting_date(df)
-        
-        equity_holdings = []
-        debt_holdings = []
-        
-        # find the header row
-        header_row_idx = None
-        for i in range(min(20, len(df))):
-            row_text = ' '.join([str(x) for x in df.iloc[i].values])
-            if 'Name of the Instrument' in row_text and 'ISIN' in row_text:
-                header_row_idx = i
-                break
-        
-        if header_row_idx is None:
-            return pd.DataFrame(), pd.DataFrame()
-        
-        current_type = None
-        is_data_row = False
-        
-        for idx in range(header_row_idx + 1, len(df)):
-            row = df.iloc[idx]
-            row_str = ' '.join([str(x) for x in row.values if pd.notna(x)])
-            
-            # check section type
-            if 'Equity' in row_str and 'related' in row_str:
-                current_type = 'Equity'
-                is_data_row = True
-                continue
-            elif 'Debt Instruments' in row_str:
-                current_type = 'Debt'
-                is_data_row = True
-                continue
-            elif 'Sub Total' in row_str or 'GRAND TOTAL' in row_str or 'Grand Total' in row_str:
-                continue
-            elif 'Listed' in row_str or 'Unlisted' in row_str or 'Privately placed' in row_str:
-                continue
-            elif 'Reverse Repo' in row_str or 'TREPS' in row_str or 'Net Receivables' in row_str:
-                continue
-                
-            if current_type and is_data_row:
-                # extract instrument details
-                instrument_code = str(row.iloc[0]) if pd.notna(row.iloc[0]) else None
-                instrument_name = str(row.iloc[1]) if len(row) > 1 and pd.notna(row.iloc[1]) else None
-                isin = str(row.iloc[2]) if len(row) > 2 and pd.notna(row.iloc[2]) else None
-                if not instrument_name or instrument_name == 'nan' or instrument_name == 'NaN':
-                    continue
-                if instrument_name in ['Sub Total', 'Total', 'GRAND TOTAL']:
-                    continue
-                    
-                percentage = None
-                for col_idx in [6, 5, 7]:  # try different columns
-                    if len(row) > col_idx:
-                        val = row.iloc[col_idx]
-                        if pd.notna(val):
-                            try:
-                                percentage = float(val)
-                                break
-                            except:
-                                pass
-                
-                if instrument_name and percentage is not None:
-                    holding = {
-                        'amc_name': self.amc_name,
-                        'scheme_name': scheme_full_name,
-                        'scheme_code': sheet_name,
-                        'instrument_code': instrument_code if instrument_code != 'nan' else None,
-                        'instrument_name': instrument_name,
-                        'instrument_type': current_type,
-                        'isin': isin if isin and isin != 'nan' and len(isin) == 12 else None,
-                        'portfolio_percentage': percentage,
-                        'reporting_date': self.reporting_date
-                    }
-                    
-                    if current_type == 'Equity':
-                        equity_holdings.append(holding)
-                    elif current_type == 'Debt':
-                        debt_holdings.append(holding)
-        
-        return pd.DataFrame(equity_holdings), pd.DataFrame(debt_holdings)
+            raise ValueError(f"no reporting date found in '{self.excel_file_path}'")
+        return self.reporting_date
     
     def get_scheme_list(self):
-        # get all schemes from index sheet
-        index_df = pd.read_excel(self.excel_file_path, sheet_name="Index", header=0)
-        
-        schemes = {}
-        for _, row in index_df.iterrows():
-            if pd.notna(row.iloc[1]) and pd.notna(row.iloc[2]):
-                short_name = str(row.iloc[1]).strip()
-                full_name = str(row.iloc[2]).strip()
-                if short_name and full_name and short_name != 'Short Name':
-                    schemes[short_name] = full_name
-        
-        return schemes
+        # get all schemes from the workbook (read once, then reused)
+        if self._schemes is None:
+            self._schemes = self.adapter.get_scheme_list()
+        return self._schemes
     
-    def consolidate_all_schemes(self):
+    def consolidate_all_schemes(self, verbose=True):
         # process all schemes and consolidate data
         schemes = self.get_scheme_list()
-        print(f"Found {len(schemes)} schemes to process")
+        if verbose:
+            print(f"Found {len(schemes)} schemes to process")
         
         all_equity = []
         all_debt = []
@@ -145,49 +70,36 @@ class PortfolioConsolidator:
                     all_debt.append(debt_df)
                 
                 cnt += 1
-                if cnt % 10 == 0:
+                if verbose and cnt % 10 == 0:
                     print(f"Processed {cnt}/{len(schemes)} schemes...")
                     
             except Exception as e:
                 print(f"Error processing {scheme_code}: {str(e)}")
                 continue
         
-        print(f"\nSuccessfully processed {cnt} schemes")
+        if verbose:
+            print(f"\nSuccessfully processed {cnt} schemes")
         
         # combine everything
         equity_consolidated = pd.concat(all_equity, ignore_index=True) if all_equity else pd.DataFrame()
         debt_consolidated = pd.concat(all_debt, ignore_index=True) if all_debt else pd.DataFrame()
+        equity_consolidated = apply_holdings_dtypes(equity_consolidated)
+        debt_consolidated = apply_holdings_dtypes(debt_consolidated)
+        
+        # stable instrument ids so debt without ISIN aggregates correctly
+        if self.resolver is not None:
+            equity_consolidated = self.resolver.resolve(equity_consolidated)
+            debt_consolidated = self.resolver.resolve(debt_consolidated)
         
         return equity_consolidated, debt_consolidated
     
-    def save_to_csv(self, equity_df, debt_df, output_dir="output"):
+    def save_to_csv(self, equity_df, debt_df, output_dir="output", combined_df=None, verbose=True):
         # save data to csv files
-        os.makedirs(output_dir, exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d")
-        
-        if not equity_df.empty:
-            equity_file = os.path.join(output_dir, f"equity_holdings_{timestamp}.csv")
-            equity_df.to_csv(equity_file, index=False)
-            print(f"\n✓ Equity holdings saved: {equity_file}")
-            print(f"  Total equity holdings: {len(equity_df)}")
-        
-        if not debt_df.empty:
-            debt_file = os.path.join(output_dir, f"debt_holdings_{timestamp}.csv")
-            debt_df.to_csv(debt_file, index=False)
-            print(f"✓ Debt holdings saved: {debt_file}")
-            print(f"  Total debt holdings: {len(debt_df)}")
-        
-        if not equity_df.empty or not debt_df.empty:
-            combined_df = pd.concat([equity_df, debt_df], ignore_index=True)
-            combined_file = os.path.join(output_dir, f"all_holdings_{timestamp}.csv")
-            combined_df.to_csv(combined_file, index=False)
-            print(f"✓ Combined holdings saved: {combined_file}")
-            print(f"  Total holdings: {len(combined_df)}")
-        
-        self.generate_summary(equity_df, debt_df, output_dir)
+        written = save_holdings(equity_df, debt_df, output_dir, combined_df=combined_df, verbose=verbose)
+        written['summary'] = self.generate_summary(equity_df, debt_df, output_dir, verbose=verbose)
+        return written
     
-    def generate_summary(self, equity_df, debt_df, output_dir):
+    def generate_summary(self, equity_df, debt_df, output_dir, verbose=True):
         summary = []
         
         summary.append("=" * 80)
@@ -201,23 +113,107 @@ class PortfolioConsolidator:
         if not equity_df.empty:
             summary.append("EQUITY HOLDINGS:")
             summary.append(f"  Total Holdings: {len(equity_df)}")
-            summary.append(f"  Unique Instruments: {equity_df['instrument_name'].nunique()}")
+            summary.append(f"  Unique Instruments: {count_unique_instruments(equity_df)}")
             summary.append(f"  Schemes with Equity: {equity_df['scheme_name'].nunique()}")
         
         if not debt_df.empty:
             summary.append("\nDEBT HOLDINGS:")
             summary.append(f"  Total Holdings: {len(debt_df)}")
-            summary.append(f"  Unique Instruments: {debt_df['instrument_name'].nunique()}")
+            summary.append(f"  Unique Instruments: {count_unique_instruments(debt_df)}")
             summary.append(f"  Schemes with Debt: {debt_df['scheme_name'].nunique()}")
         
         summary.append("=" * 80)
         
         summary_text = "\n".join(summary)
-        print("\n" + summary_text)
+        if verbose:
+            print("\n" + summary_text)
         
         summary_file = os.path.join(output_dir, "summary.txt")
         with open(summary_file, 'w') as f:
             f.write(summary_text)
+        return summary_file
+
+
+def count_unique_instruments(df):
+    # resolved ids when available, raw names otherwise
+    column = 'instrument_id' if 'instrument_id' in df.columns else 'instrument_name'
+    return df[column].nunique()
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    # sha256 of the file contents, used to spot re-downloaded workbooks
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_csv_atomic(df, path):
+    # write next to the target, then swap it in, so readers such as the
+    # holdings service or the watcher never see a half-written file
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def save_holdings(equity_df, debt_df, output_dir="output", combined_df=None, verbose=True,
+                  write_empty=False):
+    # write equity / debt / combined csv files, returns the paths written
+    # write_empty also writes files with no rows, so a merge that removed every
+    # row of one kind doesn't leave the previous file behind as the latest one
+    os.makedirs(output_dir, exist_ok=True)
+    
+    timestamp = datetime.now().strftime("%Y%m%d")
+    written = {}
+    
+    if write_empty or not equity_df.empty:
+        equity_file = os.path.join(output_dir, f"equity_holdings_{timestamp}.csv")
+        write_csv_atomic(equity_df, equity_file)
+        written['equity'] = equity_file
+        if verbose:
+            print(f"\n✓ Equity holdings saved: {equity_file}")
+            print(f"  Total equity holdings: {len(equity_df)}")
+    
+    if write_empty or not debt_df.empty:
+        debt_file = os.path.join(output_dir, f"debt_holdings_{timestamp}.csv")
+        write_csv_atomic(debt_df, debt_file)
+        written['debt'] = debt_file
+        if verbose:
+            print(f"✓ Debt holdings saved: {debt_file}")
+            print(f"  Total debt holdings: {len(debt_df)}")
+    
+    if write_empty or not equity_df.empty or not debt_df.empty:
+        if combined_df is None:
+            combined_df = combine_holdings(equity_df, debt_df)
+        combined_file = os.path.join(output_dir, f"all_holdings_{timestamp}.csv")
+        write_csv_atomic(combined_df, combined_file)
+        written['all'] = combined_file
+        if verbose:
+            print(f"✓ Combined holdings saved: {combined_file}")
+            print(f"  Total holdings: {len(combined_df)}")
+    
+    return written
+
+
+def combine_holdings(equity_df, debt_df):
+    # equity + debt in one frame (re-applies categoricals lost by concat)
+    return apply_holdings_dtypes(pd.concat([equity_df, debt_df], ignore_index=True))
+
+def latest_holdings_files(output_dir="output"):
+    # most recent equity / debt / all csv files (the date is in the file name)
+    files = {}
+    if not os.path.isdir(output_dir):
+        return files
+    
+    for filename in sorted(os.listdir(output_dir)):
+        if not filename.endswith('.csv'):
+            continue
+        for kind in ('equity', 'debt', 'all'):
+            if filename.startswith(f"{kind}_holdings_"):
+                files[kind] = os.path.join(output_dir, filename)
+    
+    return files
 
 
 def main():
@@ -232,11 +228,19 @@ def main():
         print(f"Error: File '{excel_file}' not found!")
         return
     
-    consolidator = PortfolioConsolidator(excel_file, amc_name="Axis Mutual Fund")
+    consolidator = PortfolioConsolidator(excel_file, amc_name="Axis Mutual Fund", resolver=InstrumentResolver())
     
     print("Starting consolidation process...\n")
     equity_df, debt_df = consolidator.consolidate_all_schemes()
     
+    consolidator.close()
+    
+    try:
+        consolidator.require_reporting_date()
+    except ValueError as e:
+        print(f"Error: {str(e)}, not saving")
+        return
+    
     print("\nSaving results to CSV files...")
     consolidator.save_to_csv(equity_df, debt_df)
     
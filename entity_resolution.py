@@ -0,0 +1,239 @@
+# Entity resolution for instruments
+# Gives every holding a stable `instrument_id`. Rows with an ISIN use the ISIN.
+# Rows without one are matched on a normalized name (issuer, coupon, maturity):
+#   - an exact normalized-name match to exactly one known ISIN reuses that ISIN
+#   - a name linked to several ISINs is ambiguous: it gets its own INST id and
+#     is listed for review
+#   - otherwise it is compared token by token (allowing typos in long words)
+#     with other no-ISIN names that share a blocking key (first issuer token,
+#     coupon, maturity and distinguishing tokens such as series numbers or DVR),
+#     so "7.90% X Ltd (10/08/2028) **" and "7.9% X Limited (10/08/2028)" share
+#     one INST id
+# A fuzzy match never hands out a real ISIN. INST ids are cached so they stay
+# the same across months.
+
+from difflib import SequenceMatcher
+import hashlib
+import json
+import re
+import os
+
+
+INSTRUMENT_ID_CACHE_FILE = os.path.join("output", "instrument_ids.json")
+
+# spelling variants seen in AMC sheets
+ABBREVIATIONS = {
+    'ltd': 'limited',
+    'pvt': 'private',
+    'co': 'company',
+    'corp': 'corporation',
+    'dev': 'development',
+    'devp': 'development',
+    'govt': 'government',
+    'goi': 'government india',
+    'sdl': 'state development loans',
+    'fin': 'finance',
+    'intl': 'international',
+    'natl': 'national',
+    'sr': 'series',
+}
+
+# tokens that say nothing about the issuer, never used as blocking keys
+STOP_TOKENS = {'the', 'of', 'and', 'for', 'india', 'limited', 'private', 'company', 'md'}
+
+# tokens that tell two otherwise identical names apart - these must match exactly
+DISTINGUISHING_TOKENS = {'dvr', 'partly', 'warrant', 'warrants', 'rights', 'preference'}
+SERIES_MARKERS = {'series', 'tranche', 'option'}
+ROMAN_RE = re.compile(r'^m{0,3}(cm|cd|d?c{0,3})(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})$')
+
+COUPON_RE = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+DATE_RE = re.compile(r'(\d{1,2})[/\-.](\d{1,2})[/\-.](\d{2,4})')
+ISIN_RE = re.compile(r'^[A-Z]{2}[A-Z0-9]{9}[0-9]$')
+
+# per-token similarity for typos in longer words ("utilties" vs "utilities")
+TOKEN_MATCH_THRESHOLD = 0.85
+TYPO_MIN_TOKEN_LENGTH = 6
+
+
+def parse_instrument_name(name):
+    # split a raw instrument name into (issuer, coupon, maturity)
+    text = str(name).lower()
+
+    coupon = ''
+    match = COUPON_RE.search(text)
+    if match:
+        coupon = f"{float(match.group(1)):g}"
+        text = text[:match.start()] + ' ' + text[match.end():]
+
+    maturity = ''
+    match = DATE_RE.search(text)
+    if match:
+        day, month, year = match.groups()
+        if len(year) == 2:
+            year = '20' + year
+        maturity = f"{year}-{int(month):02d}-{int(day):02d}"
+        text = text[:match.start()] + ' ' + text[match.end():]
+
+    text = text.replace('&', ' and ')
+    tokens = re.findall(r'[a-z0-9]+', text)
+    tokens = ' '.join(ABBREVIATIONS.get(t, t) for t in tokens).split()
+    issuer = ' '.join(t for t in tokens if t != 'md')
+
+    return issuer, coupon, maturity
+
+
+def normalize_instrument_name(name):
+    # canonical text form used as the cache key
+    return '|'.join(parse_instrument_name(name))
+
+
+def distinguishing_tokens(issuer):
+    # series / tranche labels, roman numerals, numbers and share-class words
+    tokens = issuer.split()
+    found = set()
+    for i, token in enumerate(tokens):
+        if token in DISTINGUISHING_TOKENS or any(ch.isdigit() for ch in token):
+            found.add(token)
+        elif ROMAN_RE.match(token):
+            found.add(token)
+        elif token in SERIES_MARKERS and i + 1 < len(tokens):
+            found.add(f"{token}:{tokens[i + 1]}")
+    return tuple(sorted(found))
+
+
+def issuer_tokens(normalized):
+    return [t for t in normalized.split('|')[0].split() if t not in STOP_TOKENS]
+
+
+def blocking_key(normalized):
+    # first meaningful issuer token + coupon + maturity + distinguishing tokens
+    issuer, coupon, maturity = normalized.split('|')
+    tokens = issuer_tokens(normalized)
+    first_token = tokens[0] if tokens else ''
+    return first_token, coupon, maturity, distinguishing_tokens(issuer)
+
+
+def issuer_similarity(a, b):
+    # token-aligned comparison: same number of issuer tokens, each one equal or
+    # a close typo of a long word. Returns 0.0 when the issuers differ.
+    tokens_a, tokens_b = issuer_tokens(a), issuer_tokens(b)
+    if len(tokens_a) != len(tokens_b):
+        return 0.0
+
+    total = 0.0
+    for x, y in zip(tokens_a, tokens_b):
+        if x == y:
+            total += 1.0
+            continue
+        if min(len(x), len(y)) < TYPO_MIN_TOKEN_LENGTH:
+            return 0.0
+        score = SequenceMatcher(None, x, y).ratio()
+        if score < TOKEN_MATCH_THRESHOLD:
+            return 0.0
+        total += score
+    return total / len(tokens_a) if tokens_a else 1.0
+
+
+def make_instrument_id(normalized):
+    # deterministic ID for instruments without an ISIN
+    return "INST" + hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12].upper()
+
+
+class InstrumentResolver:
+
+    def __init__(self, cache_file=INSTRUMENT_ID_CACHE_FILE):
+        self.cache_file = cache_file
+        # normalized name -> INST id (rows without ISIN only)
+        self.ids = {}
+        # normalized name -> ISINs seen for that name
+        self.isins = {}
+        # normalized name -> ISINs, for no-ISIN names that matched several ISINs
+        self.review = {}
+        self._load_cache()
+
+        # blocking key -> [normalized names], only INST names are fuzzy candidates
+        self.blocks = {}
+        for normalized in self.ids:
+            self.blocks.setdefault(blocking_key(normalized), []).append(normalized)
+
+    def _load_cache(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        self.ids = cache.get('ids', {})
+        self.isins = {name: set(isins) for name, isins in cache.get('isins', {}).items()}
+
+    def save(self):
+        if not self.cache_file:
+            return
+        os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+        cache = {
+            'ids': self.ids,
+            'isins': {name: sorted(isins) for name, isins in self.isins.items()},
+            'review': {name: sorted(isins) for name, isins in self.review.items()},
+        }
+        with open(self.cache_file, 'w') as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+
+    def _register(self, normalized, instrument_id):
+        self.ids[normalized] = instrument_id
+        self.blocks.setdefault(blocking_key(normalized), []).append(normalized)
+
+    def _find_match(self, normalized):
+        # compare only against no-ISIN names in the same block
+        best_id, best_score = None, 0.0
+        for candidate in self.blocks.get(blocking_key(normalized), []):
+            score = issuer_similarity(normalized, candidate)
+            if score > best_score:
+                best_id, best_score = self.ids[candidate], score
+        return best_id
+
+    def resolve_name(self, name, isin=None):
+        normalized = normalize_instrument_name(name)
+
+        if isin:
+            self.isins.setdefault(normalized, set()).add(isin)
+            return isin
+
+        known_isins = self.isins.get(normalized, set())
+        if len(known_isins) == 1:
+            # same normalized name as exactly one ISIN, not a fuzzy guess
+            return next(iter(known_isins))
+        if len(known_isins) > 1:
+            self.review[normalized] = known_isins
+
+        if normalized in self.ids:
+            return self.ids[normalized]
+
+        instrument_id = self._find_match(normalized) or make_instrument_id(normalized)
+        self._register(normalized, instrument_id)
+        return instrument_id
+
+    def resolve(self, df):
+        # add an instrument_id column to a holdings frame
+        if df.empty:
+            df = df.copy()
+            df['instrument_id'] = []
+            return df
+
+        if 'isin' in df.columns:
+            isins = [x if isinstance(x, str) and ISIN_RE.match(x) else None for x in df['isin']]
+        else:
+            isins = [None] * len(df)
+
+        # ISIN rows first so their names are known before matching the rest,
+        # otherwise keep first-seen order so IDs are deterministic
+        pairs = list(zip(df['instrument_name'].astype(str), isins))
+        resolved = {}
+        for pair in sorted(dict.fromkeys(pairs), key=lambda p: p[1] is None):
+            resolved[pair] = self.resolve_name(*pair)
+
+        df = df.copy()
+        df['instrument_id'] = [resolved[pair] for pair in pairs]
+        self.save()
+        return df
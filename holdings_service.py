@@ -0,0 +1,259 @@
+# Read-only holdings query service
+# Loads the latest all_holdings_*.csv once into in-memory indexes and serves
+# JSON lookups over HTTP. Responses are kept in an LRU cache with ETags, and
+# the data is hot-swapped when a newer output file appears.
+#
+# Endpoints:
+#   GET /health
+#   GET /schemes/<scheme code or name>
+#   GET /isin/<isin>
+#   GET /top?n=10[&scheme=<code>][&type=Equity|Debt]
+#
+# Usage:
+#   python holdings_service.py [output_dir] [port]
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+from collections import OrderedDict
+import pandas as pd
+import threading
+import hashlib
+import json
+import sys
+import os
+
+from consolidate_portfolio import latest_holdings_files
+
+
+MAX_TOP_N = 500
+
+
+def _json_default(value):
+    # numpy scalars that survive to_dict()
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class HoldingsSnapshot:
+    # immutable, indexed view of one all_holdings csv file
+
+    def __init__(self, csv_path):
+        self.source = csv_path
+        self.mtime_ns = os.stat(csv_path).st_mtime_ns
+        self.version = f"{os.path.basename(csv_path)}:{self.mtime_ns}"
+
+        df = pd.read_csv(csv_path)
+        df = df.sort_values('portfolio_percentage', ascending=False, kind='stable')
+        df = df.astype(object).where(df.notna(), None)
+        self.records = df.to_dict('records')
+
+        self.by_scheme = {}
+        self.by_isin = {}
+        for record in self.records:
+            keys = {str(k).lower() for k in (record.get('scheme_code'), record.get('scheme_name')) if k}
+            for key in keys:
+                self.by_scheme.setdefault(key, []).append(record)
+            if record.get('isin'):
+                self.by_isin.setdefault(record['isin'].upper(), []).append(record)
+
+    def scheme(self, key):
+        return self.by_scheme.get(key.lower(), [])
+
+    def isin(self, isin):
+        return self.by_isin.get(isin.upper(), [])
+
+    def top(self, n, scheme=None, instrument_type=None):
+        rows = self.scheme(scheme) if scheme else self.records
+        if instrument_type:
+            rows = (r for r in rows if str(r.get('instrument_type', '')).lower() == instrument_type.lower())
+        result = []
+        for row in rows:  # already sorted by weight
+            result.append(row)
+            if len(result) >= n:
+                break
+        return result
+
+
+class ResponseCache:
+    # thread-safe LRU of encoded responses: key -> (status, body, etag)
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class HoldingsStore:
+    # holds the current snapshot and swaps in a new one when the output changes
+
+    def __init__(self, output_dir="output", reload_interval=5.0):
+        self.output_dir = output_dir
+        self.reload_interval = reload_interval
+        self.cache = ResponseCache()
+        self.snapshot = None
+        self._stop = threading.Event()
+        self.reload()
+
+    def _latest_source(self):
+        return latest_holdings_files(self.output_dir).get('all')
+
+    def reload(self):
+        # build the new snapshot first, then swap the reference in one step
+        path = self._latest_source()
+        if path is None:
+            return False
+        current = self.snapshot
+        if current is not None and current.source == path and \
+                current.mtime_ns == os.stat(path).st_mtime_ns:
+            return False
+
+        snapshot = HoldingsSnapshot(path)
+        self.snapshot = snapshot
+        self.cache.clear()
+        print(f"✓ Loaded {len(snapshot.records)} holdings from {path}")
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.reload_interval):
+            try:
+                self.reload()
+            except Exception as e:
+                # keep serving the old snapshot
+                print(f"⚠ Reload failed: {str(e)}")
+
+    def start_watching(self):
+        thread = threading.Thread(target=self._watch, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+
+class HoldingsRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive for repeated lookups
+    # headers and body go out as two writes; with Nagle on, delayed ACKs stall
+    # every keep-alive response by ~40ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass  # per-request logging to stderr is too slow under load
+
+    def do_GET(self):
+        store = self.server.store
+        snapshot = store.snapshot
+        if snapshot is None:
+            self._send(503, b'{"error": "no holdings loaded"}', None)
+            return
+
+        cache_key = (snapshot.version, self.path)
+        entry = store.cache.get(cache_key)
+        if entry is None:
+            status, payload = self._route(snapshot)
+            body = json.dumps(payload, default=_json_default).encode('utf-8')
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            entry = (status, body, etag)
+            if status == 200:
+                store.cache.put(cache_key, entry)
+
+        status, body, etag = entry
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self._send(304, b'', etag)
+            return
+        self._send(status, body, etag)
+
+    def _route(self, snapshot):
+        url = urlsplit(self.path)
+        parts = [unquote(p) for p in url.path.split('/') if p]
+        query = parse_qs(url.query)
+
+        if parts == ['health']:
+            return 200, {'status': 'ok', 'source': snapshot.source,
+                         'version': snapshot.version, 'holdings': len(snapshot.records)}
+
+        if len(parts) == 2 and parts[0] == 'schemes':
+            rows = snapshot.scheme(parts[1])
+            if not rows:
+                return 404, {'error': f"scheme '{parts[1]}' not found"}
+            return 200, {'scheme': parts[1], 'count': len(rows), 'holdings': rows}
+
+        if len(parts) == 2 and parts[0] == 'isin':
+            rows = snapshot.isin(parts[1])
+            if not rows:
+                return 404, {'error': f"isin '{parts[1]}' not found"}
+            return 200, {'isin': parts[1].upper(), 'count': len(rows), 'holdings': rows}
+
+        if parts == ['top']:
+            try:
+                n = int(query.get('n', ['10'])[0])
+            except ValueError:
+                return 400, {'error': 'n must be an integer'}
+            n = max(1, min(n, MAX_TOP_N))
+            scheme = query.get('scheme', [None])[0]
+            instrument_type = query.get('type', [None])[0]
+            rows = snapshot.top(n, scheme=scheme, instrument_type=instrument_type)
+            return 200, {'n': n, 'scheme': scheme, 'type': instrument_type,
+                         'count': len(rows), 'holdings': rows}
+
+        return 404, {'error': 'unknown endpoint'}
+
+    def _send(self, status, body, etag):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+def make_server(output_dir="output", host="127.0.0.1", port=8765, reload_interval=5.0):
+    store = HoldingsStore(output_dir=output_dir, reload_interval=reload_interval)
+    server = ThreadingHTTPServer((host, port), HoldingsRequestHandler)
+    server.daemon_threads = True
+    server.store = store
+    return server
+
+
+def main():
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else "output"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+
+    server = make_server(output_dir=output_dir, port=port)
+    if server.store.snapshot is None:
+        print(f"⚠ No all_holdings_*.csv in '{output_dir}' yet, waiting for one...")
+    server.store.start_watching()
+
+    print(f"🌐 Serving holdings on http://127.0.0.1:{port} - Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n✓ Server stopped")
+    finally:
+        server.store.stop()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
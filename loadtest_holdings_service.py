@@ -0,0 +1,115 @@
+# Load test for holdings_service.py
+# Fires concurrent scheme / ISIN / top-N lookups at a running service and
+# reports latency percentiles. Some requests resend the ETag to exercise 304s.
+#
+# Usage:
+#   python holdings_service.py &
+#   python loadtest_holdings_service.py [base_url] [threads] [requests_per_thread]
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, quote
+import http.client
+import random
+import json
+import time
+import sys
+
+
+def fetch_json(conn, path):
+    conn.request("GET", path)
+    response = conn.getresponse()
+    return json.loads(response.read())
+
+
+def build_request_paths(conn):
+    # sample real scheme codes and ISINs from the service itself
+    top = fetch_json(conn, "/top?n=500")['holdings']
+    schemes = sorted({row['scheme_code'] for row in top if row.get('scheme_code')})
+    isins = sorted({row['isin'] for row in top if row.get('isin')})
+
+    paths = [f"/schemes/{quote(s)}" for s in schemes]
+    paths += [f"/isin/{quote(i)}" for i in isins]
+    paths += [f"/top?n={n}" for n in (5, 10, 25, 50)]
+    paths += [f"/top?n=10&scheme={quote(s)}" for s in schemes[:20]]
+    return paths
+
+
+def worker(host, port, paths, num_requests, etag_ratio, seed):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    etags = {}
+    latencies = []
+    statuses = {}
+
+    for _ in range(num_requests):
+        path = rng.choice(paths)
+        headers = {}
+        if path in etags and rng.random() < etag_ratio:
+            headers['If-None-Match'] = etags[path]
+
+        start = time.perf_counter()
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+
+        statuses[response.status] = statuses.get(response.status, 0) + 1
+        if response.getheader('ETag'):
+            etags[path] = response.getheader('ETag')
+
+    conn.close()
+    return latencies, statuses
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def run_load_test(base_url="http://127.0.0.1:8765", threads=16, requests_per_thread=500, etag_ratio=0.3):
+    url = urlsplit(base_url)
+    host, port = url.hostname, url.port or 80
+
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    paths = build_request_paths(conn)
+    conn.close()
+    print(f"Using {len(paths)} distinct request paths, {threads} threads x {requests_per_thread} requests")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(
+            lambda seed: worker(host, port, paths, requests_per_thread, etag_ratio, seed),
+            range(threads)
+        ))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(l for lat, _ in results for l in lat)
+    statuses = {}
+    for _, st in results:
+        for code, count in st.items():
+            statuses[code] = statuses.get(code, 0) + count
+
+    print("\n" + "=" * 60)
+    print("HOLDINGS SERVICE LOAD TEST")
+    print("=" * 60)
+    print(f"  Requests: {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} req/s)")
+    print(f"  Status codes: {dict(sorted(statuses.items()))}")
+    for pct in (50, 90, 95, 99):
+        print(f"  p{pct}: {percentile(latencies, pct) * 1000:.2f} ms")
+    print(f"  max: {latencies[-1] * 1000:.2f} ms")
+    print("=" * 60)
+
+    return latencies
+
+
+def main():
+    base_url = sys.argv[1] if len(sys.argv) > 1 else "http://127.0.0.1:8765"
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    requests_per_thread = int(sys.argv[3]) if len(sys.argv) > 3 else 500
+    run_load_test(base_url, threads, requests_per_thread)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Consolidate + validate in one process
+# Holdings parsed by PortfolioConsolidator go straight into DataValidator,
+# so the csv files don't have to be read back in. The csv files are written
+# on a background thread while validation runs.
+#
+# Usage:
+#   python run_pipeline.py [excel_file]
+
+from concurrent.futures import ThreadPoolExecutor
+import time
+import sys
+import os
+
+from consolidate_portfolio import PortfolioConsolidator, combine_holdings
+from entity_resolution import InstrumentResolver
+from validate_data import DataValidator
+
+
+def run_pipeline(excel_file, output_dir="output", amc_name=None):
+    start = time.perf_counter()
+
+    resolver = InstrumentResolver(os.path.join(output_dir, "instrument_ids.json"))
+    consolidator = PortfolioConsolidator(excel_file, amc_name=amc_name, resolver=resolver,
+                                         layout_cache_file=os.path.join(output_dir, ".layout_cache.json"))
+
+    print("Starting consolidation process...\n")
+    try:
+        equity_df, debt_df = consolidator.consolidate_all_schemes()
+    finally:
+        consolidator.close()
+    consolidator.require_reporting_date()
+    all_df = combine_holdings(equity_df, debt_df)
+    parsed_at = time.perf_counter()
+    print(f"\n⏱ Parsing finished in {parsed_at - start:.1f}s")
+
+    # persist in the background, validate the in-memory frames meanwhile
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        write_job = writer.submit(
+            consolidator.save_to_csv, equity_df, debt_df, output_dir,
+            combined_df=all_df, verbose=False
+        )
+
+        validator = DataValidator(output_dir=output_dir)
+        validator.validate_frames(
+            equity_df if not equity_df.empty else None,
+            debt_df if not debt_df.empty else None,
+            all_df if not all_df.empty else None,
+        )
+
+        written = write_job.result()
+
+    print("\n💾 Files written:")
+    for kind, path in written.items():
+        print(f"  {kind}: {path}")
+
+    print(f"\n⏱ Total time: {time.perf_counter() - start:.1f}s")
+    return equity_df, debt_df
+
+
+def main():
+    print("=" * 80)
+    print("PORTFOLIO CONSOLIDATION + VALIDATION PIPELINE")
+    print("=" * 80)
+    print()
+
+    excel_file = sys.argv[1] if len(sys.argv) > 1 else "Monthly Portfolio-31 12 25.xlsx"
+
+    if not os.path.exists(excel_file):
+        print(f"Error: File '{excel_file}' not found!")
+        return
+
+    try:
+        run_pipeline(excel_file)
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        return
+
+    print("\n" + "=" * 80)
+    print("PIPELINE COMPLETE!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
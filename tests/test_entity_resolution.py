@@ -0,0 +1,101 @@
+import pandas as pd
+
+from entity_resolution import InstrumentResolver, normalize_instrument_name
+
+
+def make_resolver():
+    return InstrumentResolver(cache_file=None)
+
+
+def test_spelling_variants_share_an_id():
+    resolver = make_resolver()
+    a = resolver.resolve_name("7.90% Jamnagar Utilities & Power Private Limited (10/08/2028) **")
+    b = resolver.resolve_name("7.9% Jamnagar Utilities and Power Pvt Ltd (10/08/2028)")
+    assert a == b
+    assert a.startswith("INST")
+
+
+def test_abbreviated_issuer_matches_within_block():
+    resolver = make_resolver()
+    a = resolver.resolve_name("Small Industries Development Bank of India (06/11/2026)")
+    b = resolver.resolve_name("Small Industries Dev Bank of India (06/11/2026) **")
+    assert a == b
+
+
+def test_different_maturity_is_a_different_instrument():
+    resolver = make_resolver()
+    a = resolver.resolve_name("7.9% Jamnagar Utilities & Power Private Limited (10/08/2028)")
+    b = resolver.resolve_name("7.9% Jamnagar Utilities & Power Private Limited (10/08/2029)")
+    assert a != b
+
+
+def test_series_numbers_must_match_exactly():
+    resolver = make_resolver()
+    a = resolver.resolve_name("8.1% Bharti Telecom Ltd Series XVII (10/08/2028)")
+    b = resolver.resolve_name("8.1% Bharti Telecom Ltd Series XVIII (10/08/2028)")
+    assert a != b
+
+
+def test_dvr_does_not_take_ordinary_share_isin():
+    resolver = make_resolver()
+    assert resolver.resolve_name("Tata Motors Limited", isin="INE155A01022") == "INE155A01022"
+    dvr = resolver.resolve_name("Tata Motors Limited DVR")
+    assert dvr != "INE155A01022"
+    assert dvr.startswith("INST")
+
+
+def test_fuzzy_match_never_returns_an_isin():
+    resolver = make_resolver()
+    resolver.resolve_name("HDFC Bank Limited", isin="INE040A01034")
+    other = resolver.resolve_name("HDFC Bank Limted")
+    assert other.startswith("INST")
+
+
+def test_exact_normalized_name_reuses_single_isin():
+    resolver = make_resolver()
+    resolver.resolve_name("7.06% Government of India (10/04/2028)", isin="IN0020230010")
+    assert resolver.resolve_name("7.06% Govt of India (10/04/2028)") == "IN0020230010"
+
+
+def test_name_with_several_isins_is_flagged_for_review():
+    resolver = make_resolver()
+    name = "Small Industries Dev Bank of India (06/03/2026) **"
+    resolver.resolve_name(name, isin="INE556F16AA1")
+    resolver.resolve_name(name, isin="INE556F16AB9")
+    instrument_id = resolver.resolve_name(name)
+    assert instrument_id.startswith("INST")
+    assert normalize_instrument_name(name) in resolver.review
+
+
+def test_ids_are_stable_across_runs(tmp_path):
+    cache_file = tmp_path / "instrument_ids.json"
+    first = InstrumentResolver(cache_file=str(cache_file))
+    df = pd.DataFrame({
+        'instrument_name': ["Clearing Corporation of India Ltd", "HDFC Bank Limited"],
+        'isin': [None, "INE040A01034"],
+    })
+    ids = list(first.resolve(df)['instrument_id'])
+
+    second = InstrumentResolver(cache_file=str(cache_file))
+    variant = pd.DataFrame({
+        'instrument_name': ["Clearing Corporation of India Limited", "HDFC Bank Limited"],
+        'isin': [None, None],
+    })
+    assert list(second.resolve(variant)['instrument_id']) == ids
+
+
+def test_typo_in_long_issuer_word_still_matches():
+    resolver = make_resolver()
+    a = resolver.resolve_name("7.9% Jamnagar Utilities & Power Private Limited (10/08/2028)")
+    b = resolver.resolve_name("7.9% Jamnagar Utilties & Power Pvt Ltd (10/08/2028)")
+    assert a == b
+
+
+def test_issuers_sharing_a_long_suffix_are_not_merged():
+    resolver = make_resolver()
+    a = resolver.resolve_name("Bajaj Finance Limited January 2026 Future")
+    b = resolver.resolve_name("Bajaj Finserv Limited January 2026 Future")
+    c = resolver.resolve_name("Tata Elxsi Limited January 2026 Future")
+    d = resolver.resolve_name("Tata Steel Limited January 2026 Future")
+    assert a != b
+    assert c != d
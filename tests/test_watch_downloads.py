@@ -0,0 +1,106 @@
+import shutil
+
+import openpyxl
+import pandas as pd
+
+from consolidate_portfolio import latest_holdings_files
+from watch_downloads import DownloadWatcher
+
+
+def write_workbook(path, statement_date, equity=(), debt=()):
+    # minimal Axis-layout workbook: Index sheet + one scheme sheet
+    wb = openpyxl.Workbook()
+    index = wb.active
+    index.title = "Index"
+    index.append(["Sr No", "Short Name", "Scheme Name"])
+    index.append([1, "AXEQ", "Axis Test Equity Fund"])
+
+    sheet = wb.create_sheet("AXEQ")
+    sheet.append(["Axis Test Equity Fund"])
+    sheet.append([f"Monthly Portfolio Statement as on {statement_date}"])
+    sheet.append([])
+    sheet.append(["Code", "Name of the Instrument", "ISIN", "Industry", "Quantity",
+                  "Market Value", "% to Net Assets"])
+    if equity:
+        sheet.append([None, "Equity & related"])
+        for name, isin, weight in equity:
+            sheet.append([None, name, isin, "Banks", 10, 100.0, weight])
+    if debt:
+        sheet.append([None, "Debt Instruments"])
+        for name, isin, weight in debt:
+            sheet.append([None, name, isin, "CRISIL AAA", 10, 100.0, weight])
+    wb.save(path)
+
+
+def settle(watcher, start):
+    # first poll records the file, the second one after settle_seconds processes it
+    watcher.poll_once(now=start)
+    return watcher.poll_once(now=start + watcher.settle_seconds + 1)
+
+
+def read_latest(output_dir):
+    files = latest_holdings_files(str(output_dir))
+    return {kind: pd.read_csv(path) for kind, path in files.items()}
+
+
+EQUITY = [("HDFC Bank Limited", "INE040A01034", 5.0), ("ICICI Bank Limited", "INE090A01021", 4.0)]
+DEBT = [("7.9% Jamnagar Utilities & Power Private Limited (10/08/2028)", "INE936D07083", 1.5)]
+
+
+def make_watcher(tmp_path):
+    downloads = tmp_path / "downloads"
+    downloads.mkdir()
+    return downloads, DownloadWatcher(str(downloads), str(tmp_path / "output"),
+                                      poll_interval=0, settle_seconds=3.0)
+
+
+def test_nothing_is_processed_before_the_file_settles(tmp_path):
+    downloads, watcher = make_watcher(tmp_path)
+    path = downloads / "axis.xlsx"
+    write_workbook(path, "December 31, 2025", EQUITY, DEBT)
+
+    assert watcher.poll_once(now=100.0) == []
+    assert watcher.poll_once(now=102.0) == []
+    assert latest_holdings_files(str(tmp_path / "output")) == {}
+
+    assert watcher.poll_once(now=104.0) == [str(path)]
+    assert watcher.poll_once(now=110.0) == []
+
+
+def test_same_content_under_another_name_is_skipped(tmp_path):
+    downloads, watcher = make_watcher(tmp_path)
+    write_workbook(downloads / "axis.xlsx", "December 31, 2025", EQUITY, DEBT)
+    assert len(settle(watcher, 0.0)) == 1
+
+    shutil.copy(downloads / "axis.xlsx", downloads / "axis (1).xlsx")
+    assert settle(watcher, 100.0) == []
+
+    outputs = read_latest(tmp_path / "output")
+    assert len(outputs['equity']) == len(EQUITY)
+    assert len(outputs['debt']) == len(DEBT)
+
+
+def test_replaced_workbook_only_updates_its_own_date(tmp_path):
+    downloads, watcher = make_watcher(tmp_path)
+    write_workbook(downloads / "axis_dec.xlsx", "December 31, 2025", EQUITY, DEBT)
+    write_workbook(downloads / "axis_jan.xlsx", "January 31, 2026", EQUITY, DEBT)
+    assert len(settle(watcher, 0.0)) == 2
+
+    # December re-published with one equity holding and no debt section at all
+    write_workbook(downloads / "axis_dec.xlsx", "December 31, 2025", EQUITY[:1])
+    assert settle(watcher, 100.0) == [str(downloads / "axis_dec.xlsx")]
+
+    outputs = read_latest(tmp_path / "output")
+    equity, debt = outputs['equity'], outputs['debt']
+    assert equity[equity['reporting_date'] == '2025-12-31']['instrument_name'].tolist() == [EQUITY[0][0]]
+    assert len(equity[equity['reporting_date'] == '2026-01-31']) == len(EQUITY)
+    assert debt['reporting_date'].tolist() == ['2026-01-31'] * len(DEBT)
+    assert len(outputs['all']) == len(equity) + len(debt)
+
+
+def test_workbook_without_statement_date_is_not_merged(tmp_path):
+    downloads, watcher = make_watcher(tmp_path)
+    write_workbook(downloads / "axis.xlsx", "sometime", EQUITY, DEBT)
+
+    assert settle(watcher, 0.0) == []
+    assert latest_holdings_files(str(tmp_path / "output")) == {}
@@ -5,6 +5,9 @@ import pandas as pd
 import os
 from datetime import datetime
 
+from amc_adapters import apply_holdings_dtypes
+from consolidate_portfolio import latest_holdings_files
+
 
 class DataValidator:
     
@@ -12,20 +15,8 @@ class DataValidator:
         self.output_dir = output_dir
         
     def get_latest_csv_files(self):
-        files = {}
-        
-        for filename in os.listdir(self.output_dir):
-            if filename.endswith('.csv'):
-                filepath = os.path.join(self.output_dir, filename)
-                
-                if 'equity' in filename and 'all' not in filename:
-                    files['equity'] = filepath
-                elif 'debt' in filename and 'all' not in filename:
-                    files['debt'] = filepath
-                elif 'all_holdings' in filename:
-                    files['all'] = filepath
-        
-        return files
+        # newest equity / debt / all set, older dated runs stay in output/
+        return latest_holdings_files(self.output_dir)
     
     def validate_data_quality(self, df, data_type):
         # perform data quality checks
@@ -50,6 +41,8 @@ class DataValidator:
         print(f"  Unique AMCs: {df['amc_name'].nunique()}")
         print(f"  Unique Schemes: {df['scheme_name'].nunique()}")
         print(f"  Unique Instruments: {df['instrument_name'].nunique()}")
+        if 'instrument_id' in df.columns:
+            print(f"  Resolved Instruments (by instrument_id): {df['instrument_id'].nunique()}")
         if 'instrument_type' in df.columns:
             print(f"  Instrument Types: {df['instrument_type'].nunique()}")
         
@@ -78,7 +71,7 @@ class DataValidator:
         
 
         print(f"\n📑 Scheme-level Analysis:")
-        scheme_counts = df.groupby('scheme_name').size().sort_values(ascending=False)
+        scheme_counts = df.groupby('scheme_name', observed=True).size().sort_values(ascending=False)
         print(f"  Top 5 schemes by holdings count:")
         for scheme, count in scheme_counts.head(5).items():
             print(f"    - {scheme[:50]}...: {count} holdings")
@@ -131,6 +124,20 @@ class DataValidator:
         
         print(f"\n{'='*80}")
     
+    def validate_frames(self, equity_df=None, debt_df=None, all_df=None):
+        # validate holdings that are already in memory (no csv round-trip)
+        if equity_df is not None:
+            self.validate_data_quality(equity_df, "Equity Holdings")
+        
+        if debt_df is not None:
+            self.validate_data_quality(debt_df, "Debt Holdings")
+        
+        if all_df is not None:
+            self.validate_data_quality(all_df, "All Holdings")
+        
+        if equity_df is not None and debt_df is not None:
+            self.generate_insights(equity_df, debt_df)
+    
     def run_validation(self):
         print("\n" + "="*80)
         print("PORTFOLIO DATA VALIDATION & ANALYSIS")
@@ -146,24 +153,21 @@ class DataValidator:
         
         equity_df = None
         debt_df = None
+        all_df = None
         
         if 'equity' in files:
             print(f"\n📂 Loading: {files['equity']}")
-            equity_df = pd.read_csv(files['equity'])
-            self.validate_data_quality(equity_df, "Equity Holdings")
+            equity_df = apply_holdings_dtypes(pd.read_csv(files['equity']))
         
         if 'debt' in files:
             print(f"\n📂 Loading: {files['debt']}")
-            debt_df = pd.read_csv(files['debt'])
-            self.validate_data_quality(debt_df, "Debt Holdings")
+            debt_df = apply_holdings_dtypes(pd.read_csv(files['debt']))
         
         if 'all' in files:
             print(f"\n📂 Loading: {files['all']}")
-            all_df = pd.read_csv(files['all'])
-            self.validate_data_quality(all_df, "All Holdings")
+            all_df = apply_holdings_dtypes(pd.read_csv(files['all']))
         
-        if equity_df is not None and debt_df is not None:
-            self.generate_insights(equity_df, debt_df)
+        self.validate_frames(equity_df, debt_df, all_df)
         
         print("\n✅ VALIDATION COMPLETE")
         print("="*80)
@@ -0,0 +1,175 @@
+# Watch mode for the downloads directory
+# Polls the folder AxisMFPortfolioDownloader saves into, waits until a new
+# or replaced workbook has stopped changing, and merges just that workbook
+# into the existing output csv files.
+#
+# Usage:
+#   python watch_downloads.py [download_dir] [output_dir]
+
+import pandas as pd
+import json
+import time
+import sys
+import os
+
+from amc_adapters import apply_holdings_dtypes, to_holdings_frame
+from entity_resolution import InstrumentResolver
+from consolidate_portfolio import PortfolioConsolidator, save_holdings, latest_holdings_files, file_hash
+
+
+class DownloadWatcher:
+
+    def __init__(self, download_dir="downloads", output_dir="output",
+                 poll_interval=2.0, settle_seconds=3.0):
+        self.download_dir = os.path.abspath(download_dir)
+        self.output_dir = output_dir
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.state_file = os.path.join(output_dir, ".watch_state.json")
+        self.layout_cache_file = os.path.join(output_dir, ".layout_cache.json")
+
+        # path -> (size, mtime, time the signature was first seen)
+        self._pending = {}
+        # path -> signature we already handled (processed, duplicate or failed)
+        self._handled = {}
+
+        self.state = self._load_state()
+        self.resolver = InstrumentResolver(os.path.join(output_dir, "instrument_ids.json"))
+
+    def _load_state(self):
+        # content hashes that were already consolidated, survives restarts
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file) as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {'hashes': {}}
+
+    def _save_state(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(self.state_file, 'w') as f:
+            json.dump(self.state, f, indent=2)
+
+    def _list_workbooks(self):
+        # partial downloads (.crdownload, .tmp) and office lock files are ignored
+        if not os.path.isdir(self.download_dir):
+            return []
+        return [
+            os.path.join(self.download_dir, f) for f in sorted(os.listdir(self.download_dir))
+            if f.endswith('.xlsx') and not f.startswith('~$')
+        ]
+
+    def poll_once(self, now=None):
+        # one scan of the folder, returns the workbooks consolidated in this pass
+        now = time.time() if now is None else now
+        processed = []
+
+        for path in self._list_workbooks():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # removed between listdir and stat
+            signature = (stat.st_size, stat.st_mtime)
+
+            if self._handled.get(path) == signature:
+                continue
+
+            # debounce: the file must keep the same size/mtime for settle_seconds
+            pending = self._pending.get(path)
+            if pending is None or pending[:2] != signature:
+                self._pending[path] = (signature[0], signature[1], now)
+                continue
+            if now - pending[2] < self.settle_seconds:
+                continue
+
+            del self._pending[path]
+            self._handled[path] = signature
+
+            digest = file_hash(path)
+            if digest in self.state['hashes']:
+                print(f"↷ Skipping {os.path.basename(path)}: same content as "
+                      f"{os.path.basename(self.state['hashes'][digest])}")
+                continue
+
+            try:
+                self.process_workbook(path)
+            except Exception as e:
+                # not retried until the file changes again
+                print(f"✗ Error processing {os.path.basename(path)}: {str(e)}")
+                continue
+
+            self.state['hashes'][digest] = path
+            self._save_state()
+            processed.append(path)
+
+        return processed
+
+    def process_workbook(self, path):
+        start = time.perf_counter()
+        print(f"\n📥 New workbook: {os.path.basename(path)}")
+
+        consolidator = PortfolioConsolidator(path, resolver=self.resolver,
+                                             layout_cache_file=self.layout_cache_file)
+        try:
+            equity_df, debt_df = consolidator.consolidate_all_schemes(verbose=False)
+        finally:
+            consolidator.close()
+
+        # rows are replaced per (amc_name, reporting_date), so the date must be real
+        consolidator.require_reporting_date()
+
+        equity_df, debt_df = self.merge_into_outputs(equity_df, debt_df, consolidator.amc_name,
+                                                     consolidator.reporting_date)
+        written = save_holdings(equity_df, debt_df, self.output_dir, verbose=False, write_empty=True)
+
+        print(f"✓ {consolidator.amc_name} ({consolidator.reporting_date}) merged "
+              f"in {time.perf_counter() - start:.1f}s")
+        for kind, file_path in written.items():
+            print(f"  {kind}: {file_path}")
+
+    def merge_into_outputs(self, equity_df, debt_df, amc_name, reporting_date):
+        # replace rows for the same AMC + reporting date, keep everything else
+        # the key comes from the workbook, not the rows, so a kind that is empty
+        # in the new workbook still has its old rows removed
+        existing = latest_holdings_files(self.output_dir)
+        replaced = (str(amc_name), str(reporting_date))
+
+        merged = []
+        for kind, new_df in (('equity', equity_df), ('debt', debt_df)):
+            if kind not in existing:
+                merged.append(new_df)
+                continue
+
+            old_df = pd.read_csv(existing[kind])
+            keys = zip(old_df['amc_name'].astype(str), old_df['reporting_date'].astype(str))
+            old_df = old_df[[key != replaced for key in keys]]
+
+            frames = [df for df in (old_df, new_df) if not df.empty]
+            combined = pd.concat(frames, ignore_index=True) if frames else to_holdings_frame([])
+            merged.append(apply_holdings_dtypes(combined))
+
+        return merged[0], merged[1]
+
+    def run_forever(self):
+        print(f"👀 Watching {self.download_dir} (poll every {self.poll_interval}s, "
+              f"settle {self.settle_seconds}s) - Ctrl+C to stop")
+        try:
+            while True:
+                self.poll_once()
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            print("\n✓ Watcher stopped")
+
+
+def main():
+    download_dir = sys.argv[1] if len(sys.argv) > 1 else "downloads"
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else "output"
+
+    os.makedirs(download_dir, exist_ok=True)
+    watcher = DownloadWatcher(download_dir=download_dir, output_dir=output_dir)
+    watcher.run_forever()
+
+
+if __name__ == "__main__":
+    main()